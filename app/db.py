@@ -18,17 +18,40 @@ DATABASE_URL = os.getenv(
     "postgresql+asyncpg://postgres:postgres@db:5432/PokeFinder",
 )
 
+# Key for the Postgres advisory lock that serializes migrations when
+# several workers start at once
+MIGRATION_LOCK_ID = 727272
+MIGRATION_LOCK_POLL_INTERVAL = 0.5  # seconds
+
+# Connection pool sizing (tunable per deployment)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
 # Global async engine
 engine: AsyncEngine = create_async_engine(
     DATABASE_URL,
     echo=False,   
     future=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_pre_ping=False,
+    pool_recycle=1800,  # recycle connections every 30 minutes
+    connect_args={
+        # SQLAlchemy's asyncpg adapter keeps an LRU of prepared statements
+        "prepared_statement_cache_size": 500,
+        # asyncpg's own statement cache for its protocol-level queries
+        "statement_cache_size": 1024,
+        "command_timeout": 5,
+        # Queries here are small OLTP lookups; JIT only adds planning latency
+        "server_settings": {"jit": "off", "application_name": "pokefinder"},
+    },
 )
 
 # Session factory for getting AsyncSession objects
 AsyncSessionLocal = async_sessionmaker(
     engine,
     expire_on_commit=False,
+    autoflush=False,
     class_=AsyncSession,
 )
 
@@ -51,8 +74,10 @@ async def run_migrations() -> None:
     Simple, idempotent migration function with retry logic.
 
     - Waits for database to be ready (with exponential backoff)
-    - Creates the 'pokemon' table if it does not exist.
-    - Creates the 'pokemon_types' table if it does not exist.
+    - Takes a transaction-scoped advisory lock, so only one worker runs
+      the DDL at a time; the others wait and then find nothing to do.
+    - Creates any ORM tables ('pokemon', 'pokemon_types') that do not exist.
+    - Adds columns introduced later to pre-existing 'pokemon' tables.
     """
     max_retries = 10
     retry_delay = 2  # seconds
@@ -60,41 +85,23 @@ async def run_migrations() -> None:
     for attempt in range(max_retries):
         try:
             async with engine.begin() as conn:
-                # Test connection first
-                await conn.execute(text("SELECT 1"))
-                
-                # Main pokemon table
-                await conn.execute(
-                    text(
-                        """
-                        CREATE TABLE IF NOT EXISTS pokemon (
-                            pokemon_id INTEGER PRIMARY KEY,
-                            name TEXT NOT NULL,
-                            base_experience INTEGER,
-                            height INTEGER,
-                            "order" INTEGER,
-                            weight INTEGER,
-                            location_area_encounters TEXT
-                        );
-                        """
+                # Poll with the non-blocking variant: a blocking wait behind
+                # another worker's migration could exceed command_timeout and
+                # be mistaken for the database not being ready.
+                # Released automatically when this transaction ends.
+                while not (
+                    await conn.execute(
+                        text("SELECT pg_try_advisory_xact_lock(:lock_id)"),
+                        {"lock_id": MIGRATION_LOCK_ID},
                     )
-                )
+                ).scalar():
+                    await asyncio.sleep(MIGRATION_LOCK_POLL_INTERVAL)
 
-                # Types table (normalized)
-                await conn.execute(
-                    text(
-                        """
-                        CREATE TABLE IF NOT EXISTS pokemon_types (
-                            pokemon_id INTEGER REFERENCES pokemon(pokemon_id) ON DELETE CASCADE,
-                            type_name TEXT NOT NULL,
-                            type_url TEXT NOT NULL,
-                            PRIMARY KEY (pokemon_id, type_name)
-                        );
-                        """
-                    )
-                )
-                
-                # add location_name column if it doesn't exist
+                # Create every table defined on Base (pokemon, pokemon_types)
+                await conn.run_sync(Base.metadata.create_all)
+
+                # Columns added after the first release; create_all does not
+                # alter tables that already exist
                 await conn.execute(
                     text(
                         """
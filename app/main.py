@@ -1,38 +1,195 @@
 import asyncio
 import random
-import httpx
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Query, Depends
-from fastapi.responses import JSONResponse
-from sqlalchemy import text, delete, select, update, func
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text, delete, select, update, func, tuple_, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from db import engine, run_migrations, get_db
-from pokeapi_client import fetch_pokemon_list, fetch_pokemon_details, fetch_location_name_for_pokemon, fetch_all_natures
+from pokeapi_client import (
+    startup_client,
+    shutdown_client,
+    fetch_pokemon_list,
+    fetch_pokemon_details,
+    fetch_location_name_for_pokemon,
+    fetch_all_natures,
+)
 from models import Pokemon, PokemonType
 from utils import parse_limit_offset
 from schemas import SavePokemonResponse, EnrichLocationsResponse, GenerateNaturesResponse, LocationsByTypeResponse
 
-app = FastAPI(title="PokeFinder")
 
-def bad_request(message: str) -> JSONResponse:
-    return JSONResponse(status_code=400, content={"error": message})
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan handler.
 
-def server_error(message: str) -> JSONResponse:
-    return JSONResponse(status_code=500, content={"error": message})
+    Startup: runs the simple database migrations and creates the shared
+    PokeAPI client concurrently, before the app starts serving requests.
 
-@app.on_event("startup")
-async def on_startup():
+    Shutdown: closes the PokeAPI client and disposes the DB connection pool.
+    This also runs if startup fails, so a client opened before a migration
+    error is not leaked.
     """
-    Application startup hook.
+    try:
+        await asyncio.gather(run_migrations(), startup_client())
+        yield
+    finally:
+        await shutdown_client()
+        await engine.dispose()
+
+
+app = FastAPI(
+    title="PokeFinder",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+# Pokemon upsert, built once so its compiled SQL is reused on every call.
+# Executed with a list of row dicts (executemany-style bind parameters);
+# RETURNING yields one id per row actually inserted or updated.
+_pokemon_insert = pg_insert(Pokemon)
+UPSERT_POKEMON_STMT = _pokemon_insert.on_conflict_do_update(
+    index_elements=[Pokemon.pokemon_id],
+    set_={
+        col: _pokemon_insert.excluded[col]
+        for col in (
+            "name",
+            "base_experience",
+            "height",
+            "order",
+            "weight",
+            "location_area_encounters",
+        )
+    },
+).returning(Pokemon.pokemon_id)
+
+# Type upsert keyed on the (pokemon_id, type_name) primary key
+_pokemon_type_insert = pg_insert(PokemonType)
+UPSERT_POKEMON_TYPES_STMT = _pokemon_type_insert.on_conflict_do_update(
+    index_elements=[PokemonType.pokemon_id, PokemonType.type_name],
+    set_={"type_url": _pokemon_type_insert.excluded.type_url},
+)
+
+# Reconcile delete for types PokeAPI no longer reports. Expanding IN
+# parameters let one statement object serve every chunk.
+_pokemon_type_key = tuple_(PokemonType.pokemon_id, PokemonType.type_name)
+DELETE_STALE_TYPES_STMT = (
+    delete(PokemonType)
+    .where(
+        PokemonType.pokemon_id.in_(bindparam("pokemon_ids", expanding=True)),
+        _pokemon_type_key.not_in(
+            bindparam("keep_keys", expanding=True, type_=_pokemon_type_key.type)
+        ),
+    )
+    .execution_options(synchronize_session=False)
+)
+
+# Single-column updates by id, executed with a list of params
+# (bind names must differ from column names used in values())
+_pokemon_table = Pokemon.__table__
+UPDATE_LOCATION_NAME_STMT = (
+    update(_pokemon_table)
+    .where(_pokemon_table.c.pokemon_id == bindparam("b_pokemon_id"))
+    .values(location_name=bindparam("b_location_name"))
+)
+UPDATE_NATURE_STMT = (
+    update(_pokemon_table)
+    .where(_pokemon_table.c.pokemon_id == bindparam("b_pokemon_id"))
+    .values(nature=bindparam("b_nature"))
+)
+
+# /pokemon/save pipeline: details are written in chunks of SAVE_CHUNK_SIZE
+# while the rest are still being fetched (at most SAVE_QUEUE_SIZE buffered)
+SAVE_CHUNK_SIZE = 20
+SAVE_QUEUE_SIZE = 50
+
+def bad_request(message: str) -> ORJSONResponse:
+    return ORJSONResponse(status_code=400, content={"error": message})
+
+def server_error(message: str) -> ORJSONResponse:
+    return ORJSONResponse(status_code=500, content={"error": message})
+
+async def save_pokemon_chunk(
+    db: AsyncSession,
+    details_chunk: list[dict],
+    seen_ids: set[int],
+) -> int:
+    """
+    Upsert a chunk of PokeAPI Pokemon details and their types in its own
+    short transaction.
+
+    Pokemon without an id/name, or whose id is already in seen_ids
+    (saved by an earlier chunk of the same request), are skipped.
 
-    This runs before the app starts serving requests.
-    use it to run simple database migrations.
+    Rows are written in pokemon_id order, so concurrent saves over
+    overlapping windows always lock rows in the same order and cannot
+    deadlock each other.
+
+    Returns the number of Pokemon rows inserted or updated.
     """
-    await run_migrations()
-    
-    
+    pokemon_rows: dict[int, dict] = {}
+    type_rows: list[dict] = []
+
+    for details in details_chunk:
+        pokemon_id = details.get("id")
+        name = details.get("name")
+        types = details.get("types", [])
+
+        if pokemon_id is None or name is None or pokemon_id in seen_ids:
+            continue
+        seen_ids.add(pokemon_id)
+
+        pokemon_rows[pokemon_id] = {
+            "pokemon_id": pokemon_id,
+            "name": name,
+            "base_experience": details.get("base_experience"),
+            "height": details.get("height"),
+            "order": details.get("order"),
+            "weight": details.get("weight"),
+            "location_area_encounters": details.get("location_area_encounters"),
+        }
+
+        # Keep only entries that carry both a type name and URL
+        type_rows.extend(
+            {"pokemon_id": pokemon_id, "type_name": type_name, "type_url": type_url}
+            for entry in types
+            if (t := entry.get("type"))
+            and (type_name := t.get("name"))
+            and (type_url := t.get("url"))
+        )
+
+    if not pokemon_rows:
+        return 0
+
+    # Deterministic lock order (see docstring)
+    pokemon_ids = sorted(pokemon_rows)
+    type_rows.sort(key=lambda r: (r["pokemon_id"], r["type_name"]))
+
+    async with db.begin():
+        # One statement upserts the whole chunk of Pokemon
+        result = await db.execute(
+            UPSERT_POKEMON_STMT, [pokemon_rows[pid] for pid in pokemon_ids]
+        )
+        saved_count = len(result.scalars().all())
+
+        # Drop only types that no longer belong to a Pokemon in the chunk,
+        # then upsert the rest (unchanged rows are not deleted/re-inserted)
+        await db.execute(
+            DELETE_STALE_TYPES_STMT,
+            {
+                "pokemon_ids": pokemon_ids,
+                "keep_keys": [(r["pokemon_id"], r["type_name"]) for r in type_rows],
+            },
+        )
+        if type_rows:
+            await db.execute(UPSERT_POKEMON_TYPES_STMT, type_rows)
+
+    return saved_count
+
 @app.get("/pokemon/save", response_model=SavePokemonResponse)
 async def save_pokemon(
     limit: str | None = None,
@@ -76,77 +233,47 @@ async def save_pokemon(
                 "limit": limit_value,
             }
 
-        # Step 2: fetch details concurrently
-        async with httpx.AsyncClient() as client:
-            tasks = [
-                fetch_pokemon_details(client, item["url"])
+        # Step 2: fetch details concurrently and stream them to a DB writer,
+        # so PokeAPI and database round-trips overlap instead of running back
+        # to back. The queue bound keeps fetching from racing far ahead.
+        queue: asyncio.Queue[dict | None] = asyncio.Queue(maxsize=SAVE_QUEUE_SIZE)
+
+        async def produce(fetches: list[asyncio.Task]) -> None:
+            for fut in asyncio.as_completed(fetches):
+                details = await fut
+                if details is not None:
+                    await queue.put(details)
+            await queue.put(None)  # no more details
+
+        # Step 3: upsert in chunks as details arrive. Each chunk commits in
+        # its own transaction, so no connection sits idle in a transaction
+        # (holding row locks) while the remaining fetches are in flight.
+        async def consume() -> int:
+            saved = 0
+            seen_ids: set[int] = set()
+            chunk: list[dict] = []
+            while (details := await queue.get()) is not None:
+                chunk.append(details)
+                if len(chunk) >= SAVE_CHUNK_SIZE:
+                    saved += await save_pokemon_chunk(db, chunk, seen_ids)
+                    chunk = []
+            if chunk:
+                saved += await save_pokemon_chunk(db, chunk, seen_ids)
+            return saved
+
+        # The TaskGroup owns the detail fetches as well as both pipeline
+        # sides: if anything fails, every pending fetch is cancelled too, so
+        # a failed request stops its fan-out (and frees semaphore slots)
+        async with asyncio.TaskGroup() as tg:
+            fetches = [
+                tg.create_task(fetch_pokemon_details(item["url"]))
                 for item in results
                 if "url" in item
             ]
-            details_list = await asyncio.gather(*tasks)
-
-        saved_count = 0
-
-        # Step 3: upsert Pokemon + types
-        for details in details_list:
-            if details is None:
-                continue
-
-            pokemon_id = details.get("id")
-            name = details.get("name")
-            base_experience = details.get("base_experience")
-            height = details.get("height")
-            order_value = details.get("order")
-            weight = details.get("weight")
-            location_area_encounters = details.get("location_area_encounters")
-            types = details.get("types", [])
-
-            if pokemon_id is None or name is None:
-                continue
-
-            stmt = pg_insert(Pokemon).values(
-                pokemon_id=pokemon_id,
-                name=name,
-                base_experience=base_experience,
-                height=height,
-                order=order_value,
-                weight=weight,
-                location_area_encounters=location_area_encounters,
-            )
-            stmt = stmt.on_conflict_do_update(
-                index_elements=[Pokemon.pokemon_id],
-                set_={
-                    "name": name,
-                    "base_experience": base_experience,
-                    "height": height,
-                    "order": order_value,
-                    "weight": weight,
-                    "location_area_encounters": location_area_encounters,
-                },
-            )
-            await db.execute(stmt)
+            tg.create_task(produce(fetches))
+            consumer = tg.create_task(consume())
 
-            # Replace types for this Pokemon
-            await db.execute(
-                delete(PokemonType).where(PokemonType.pokemon_id == pokemon_id)
-            )
-            for entry in types:
-                t = entry.get("type", {})
-                type_name = t.get("name")
-                type_url = t.get("url")
-                if type_name and type_url:
-                    await db.execute(
-                        PokemonType.__table__.insert().values(
-                            pokemon_id=pokemon_id,
-                            type_name=type_name,
-                            type_url=type_url,
-                        )
-                    )
-
-            saved_count += 1
-
-        # Step 4: commit once for the whole batch
-        await db.commit()
+        saved_count = consumer.result()
 
         return {
             "message": "Successfully saved Pokemon to database",
@@ -197,18 +324,15 @@ async def enrich_pokemon_locations(
                 "updated_count": 0,
             }
 
-        # 2) Fetch locations concurrently
-        async with httpx.AsyncClient() as client:
-            tasks = [
-                fetch_location_name_for_pokemon(
-                    client, p.location_area_encounters
-                )
-                for p in pokemons
-            ]
-            location_names = await asyncio.gather(*tasks)
+        # 2) Fetch locations concurrently over the shared client
+        tasks = [
+            fetch_location_name_for_pokemon(p.location_area_encounters)
+            for p in pokemons
+        ]
+        location_names = await asyncio.gather(*tasks)
 
         # 3) Update DB
-        updated_count = 0
+        updates: list[dict] = []
 
         for p, loc_name in zip(pokemons, location_names):
             if not loc_name:
@@ -219,12 +343,12 @@ async def enrich_pokemon_locations(
                 # Already up-to-date
                 continue
 
-            await db.execute(
-                update(Pokemon)
-                .where(Pokemon.pokemon_id == p.pokemon_id)
-                .values(location_name=loc_name)
-            )
-            updated_count += 1
+            updates.append({"b_pokemon_id": p.pokemon_id, "b_location_name": loc_name})
+
+        updated_count = len(updates)
+
+        if updates:
+            await db.execute(UPDATE_LOCATION_NAME_STMT, updates)
 
         await db.commit()
 
@@ -267,25 +391,20 @@ async def generate_pokemon_natures(
             }
 
         # 2) Fetch all natures from PokeAPI
-        async with httpx.AsyncClient() as client:
-            natures = await fetch_all_natures(client)
+        natures = await fetch_all_natures()
 
         if not natures:
             # If we couldn't get any natures, treat as failure
             return server_error(message="Failed to assign natures")
 
         # 3) Randomly assign one nature to each Pokemon
-        assigned_count = 0
-
-        for p in pokemons:
-            random_nature = random.choice(natures)
-            
-            await db.execute(
-                update(Pokemon)
-                .where(Pokemon.pokemon_id == p.pokemon_id)
-                .values(nature=random_nature)
-            )
-            assigned_count += 1
+        assignments = [
+            {"b_pokemon_id": p.pokemon_id, "b_nature": random.choice(natures)}
+            for p in pokemons
+        ]
+        assigned_count = len(assignments)
+
+        await db.execute(UPDATE_NATURE_STMT, assignments)
 
         await db.commit()
 
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, Text, ForeignKey
+from sqlalchemy import Integer, Text, ForeignKey
 
 
 class Base(DeclarativeBase):
@@ -27,7 +27,7 @@ class Pokemon(Base):
     __tablename__ = "pokemon"
 
     pokemon_id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    name: Mapped[str] = mapped_column(String, nullable=False)
+    name: Mapped[str] = mapped_column(Text, nullable=False)
     base_experience: Mapped[int | None] = mapped_column(Integer)
     height: Mapped[int | None] = mapped_column(Integer)
     # 'order' is a reserved word in SQL, so we specify the column name explicitly
@@ -56,7 +56,7 @@ class PokemonType(Base):
         ForeignKey("pokemon.pokemon_id", ondelete="CASCADE"),
         primary_key=True,
     )
-    type_name: Mapped[str] = mapped_column(String, primary_key=True)
+    type_name: Mapped[str] = mapped_column(Text, primary_key=True)
     type_url: Mapped[str] = mapped_column(Text, nullable=False)
 
     pokemon: Mapped[Pokemon] = relationship(
@@ -1,8 +1,101 @@
+import asyncio
+import os
+
 import httpx
+import orjson
+from async_lru import alru_cache
 
 POKEAPI_BASE_URL = "https://pokeapi.co/api/v2"
 
+# Upper bound on concurrent detail fetches, so a large batch doesn't hit
+# PokeAPI with 100 simultaneous requests (and risk 429s).
+POKEAPI_MAX_CONCURRENCY = int(os.getenv("POKEAPI_MAX_CONCURRENCY", "16"))
+_FETCH_SEM = asyncio.Semaphore(POKEAPI_MAX_CONCURRENCY)
+
+# PokeAPI data is effectively static, so repeat fetches within this window
+# are served from memory. Failed requests raise and are never cached.
+POKEAPI_CACHE_TTL = 3600  # seconds
+
+# Retry policy for transient PokeAPI failures (5xx responses, network errors,
+# including failed connects). This is the only retry layer: the transport
+# itself does not retry, so every backoff happens outside the semaphore.
+POKEAPI_MAX_ATTEMPTS = 3  # total tries per URL, first one included
+POKEAPI_RETRY_DELAY = 0.2  # seconds, doubled on each attempt
+POKEAPI_MAX_RETRY_DELAY = 2.0  # seconds
+
+# Shared client, created on app startup so connections (and TLS sessions)
+# are reused across requests instead of being rebuilt per call.
+_client: httpx.AsyncClient | None = None
+
+
+async def startup_client() -> None:
+    """
+    Create the shared httpx.AsyncClient used for all PokeAPI calls.
+    """
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            base_url=POKEAPI_BASE_URL,
+            http2=True,
+            timeout=10.0,
+            # Small bursts against one host: keep every socket warm between
+            # batches rather than reconnecting (HTTP/1.1 fallback included).
+            limits=httpx.Limits(
+                max_connections=32,
+                max_keepalive_connections=32,
+                keepalive_expiry=60.0,
+            ),
+        )
+
+
+async def shutdown_client() -> None:
+    """
+    Close the shared httpx.AsyncClient on app shutdown.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Return the shared httpx.AsyncClient.
+
+    Raises RuntimeError if called before startup_client().
+    """
+    if _client is None:
+        raise RuntimeError("PokeAPI client is not initialized")
+    return _client
+
+
+async def _get_with_retry(url: str) -> httpx.Response:
+    """
+    GET a PokeAPI URL, making up to POKEAPI_MAX_ATTEMPTS attempts and
+    retrying 5xx responses and transport errors (connect failures, read
+    errors/timeouts) with exponential backoff.
+
+    Each attempt holds the fetch semaphore, but the backoff sleep does not,
+    so retries never raise the number of in-flight requests.
+
+    Returns the final response (status not checked), or raises the last
+    httpx.TransportError.
+    """
+    for attempt in range(POKEAPI_MAX_ATTEMPTS):
+        try:
+            async with _FETCH_SEM:
+                resp = await get_client().get(url)
+            if resp.status_code < 500 or attempt == POKEAPI_MAX_ATTEMPTS - 1:
+                return resp
+        except httpx.TransportError:
+            if attempt == POKEAPI_MAX_ATTEMPTS - 1:
+                raise
+
+        wait_time = min(POKEAPI_RETRY_DELAY * (2 ** attempt), POKEAPI_MAX_RETRY_DELAY)
+        await asyncio.sleep(wait_time)
+
 
+@alru_cache(maxsize=256, ttl=POKEAPI_CACHE_TTL)
 async def fetch_pokemon_list(limit: int = 20, offset: int = 0) -> dict:
     """
     Fetch a page of Pokemon from PokeAPI.
@@ -11,35 +104,63 @@ async def fetch_pokemon_list(limit: int = 20, offset: int = 0) -> dict:
         GET https://pokeapi.co/api/v2/pokemon?limit={limit}&offset={offset}
 
     Returns:
-        Parsed JSON as a Python dict.
+        Parsed JSON as a Python dict (cached per limit/offset).
     """
-    url = f"{POKEAPI_BASE_URL}/pokemon"
     params = {"limit": limit, "offset": offset}
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(url, params=params, timeout=10.0)
-        resp.raise_for_status()  # raises if status is 4xx/5xx
-        return resp.json()
+    resp = await get_client().get("/pokemon", params=params)
+    resp.raise_for_status()  # raises if status is 4xx/5xx
+    return orjson.loads(resp.content)
+
+# Fields of a /pokemon/{id} payload that /pokemon/save stores. Only these are
+# cached; the full payload (moves, sprites, game_indices, ...) is large.
+POKEMON_DETAIL_FIELDS = (
+    "id",
+    "name",
+    "base_experience",
+    "height",
+    "order",
+    "weight",
+    "location_area_encounters",
+)
+
+@alru_cache(maxsize=2048, ttl=POKEAPI_CACHE_TTL)
+async def _fetch_pokemon_details_cached(url: str) -> dict:
+    """
+    Fetch and cache detailed Pokemon info, keyed by URL.
+
+    Only POKEMON_DETAIL_FIELDS and the type name/URL of each "types" entry
+    are kept, so each cache entry stays small.
 
-async def fetch_pokemon_details(client: httpx.AsyncClient, url: str) -> dict | None:
+    Raises httpx.HTTPError on failure, so errors are not cached.
+    """
+    resp = await _get_with_retry(url)
+    resp.raise_for_status()
+    data = orjson.loads(resp.content)
+
+    details = {field: data.get(field) for field in POKEMON_DETAIL_FIELDS}
+    details["types"] = [
+        {"type": {"name": t.get("name"), "url": t.get("url")}}
+        for entry in data.get("types", [])
+        if (t := entry.get("type"))
+    ]
+    return details
+
+async def fetch_pokemon_details(url: str) -> dict | None:
     """
     Fetch detailed Pokemon info from a given PokeAPI URL.
 
     Returns:
-        Parsed JSON dict, or None if the request fails.
+        Dict with POKEMON_DETAIL_FIELDS plus "types" (same shape as the
+        PokeAPI payload), or None if the request fails.
     """
     try:
-        resp = await client.get(url, timeout=10.0)
-        resp.raise_for_status()
-        return resp.json()
+        return await _fetch_pokemon_details_cached(url)
     except httpx.HTTPError:
         # In this assignment, we simply skip failed ones
         return None
 
-async def fetch_location_name_for_pokemon(
-    client: httpx.AsyncClient,
-    encounters_url: str | None,
-) -> str | None:
+async def fetch_location_name_for_pokemon(encounters_url: str | None) -> str | None:
     """
     Given a location_area_encounters URL, fetch the encounter data and
     return the first location_area.name.
@@ -53,13 +174,13 @@ async def fetch_location_name_for_pokemon(
         return None
 
     try:
-        resp = await client.get(encounters_url, timeout=10.0)
+        resp = await _get_with_retry(encounters_url)
         resp.raise_for_status()
     except httpx.HTTPError:
         return None
 
     try:
-        data = resp.json()
+        data = orjson.loads(resp.content)
     except ValueError:
         return None
 
@@ -71,7 +192,7 @@ async def fetch_location_name_for_pokemon(
     name = loc.get("name")
     return name
 
-async def fetch_all_natures(client: httpx.AsyncClient) -> list[str]:
+async def fetch_all_natures() -> list[str]:
     """
     Fetches all available Pokemon natures from PokeAPI.
 
@@ -80,10 +201,9 @@ async def fetch_all_natures(client: httpx.AsyncClient) -> list[str]:
     Over-fetch with a large limit (e.g. 1000) to
     avoid pagination, since there are only ~25 natures.
     """
-    url = f"{POKEAPI_BASE_URL}/nature?limit=1000"
-    resp = await client.get(url, timeout=10.0)
+    resp = await get_client().get("/nature", params={"limit": 1000})
     resp.raise_for_status()
-    data = resp.json()
+    data = orjson.loads(resp.content)
 
     results = data.get("results", [])
     names: list[str] = []
@@ -16,26 +16,12 @@ def parse_limit_offset(
 
     On any invalid value, raises ValueError.
     """
-    # Parse with defaults
-    try:
-        if limit_str is None:
-            limit = default_limit
-        else:
-            limit = int(limit_str)
-
-        if offset_str is None:
-            offset = 0
-        else:
-            offset = int(offset_str)
-    except ValueError:
-        # Non-integer values
-        raise ValueError("limit and offset must be integers")
+    # Parse with defaults (int() raises ValueError on non-integer values)
+    limit = default_limit if limit_str is None else int(limit_str)
+    offset = 0 if offset_str is None else int(offset_str)
 
     # Range checks
-    if not (1 <= limit <= max_limit):
-        raise ValueError("limit out of allowed range")
-
-    if offset < 0:
-        raise ValueError("offset must be non-negative")
+    if not (1 <= limit <= max_limit and offset >= 0):
+        raise ValueError("limit or offset out of allowed range")
 
     return limit, offset